@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 
 import json
+import time
 from iota import Iota, Transaction
 from utils.hash import create_seed_hash, get_checksum, verify_checksum
 from utils.logging import FileLogger
+from utils.archive import TransferArchive, DEFAULT_ARCHIVE_AGE, DEFAULT_ARCHIVE_SEGMENT_SIZE
 from iota.crypto.addresses import AddressGenerator
 from utils.iota import address_checksum, address_balance, convert_units
 
@@ -24,6 +26,9 @@ class Account:
         self._data = None
         self._logger = FileLogger('account', args['LOG_PATH'], args['LOG_LEVEL'])
         self._account_history_executing = False
+        self._archive = TransferArchive(self._filename + '.archive')
+        self._archive_age = int(args.get('ARCHIVE_AGE', DEFAULT_ARCHIVE_AGE))
+        self._archive_segment_size = int(args.get('ARCHIVE_SEGMENT_SIZE', DEFAULT_ARCHIVE_SEGMENT_SIZE))
         self._read_account_data()
 
     @property
@@ -156,6 +161,63 @@ class Account:
         with open(self._filename, 'w') as account_data:
             json.dump(self._data, account_data, indent=4)
 
+    def _archive_transfers(self):
+        """
+        Moves confirmed transfers older than the archive age from the account file into archive segments
+        Transfers are written in chunks of ARCHIVE_SEGMENT_SIZE, the remainder stays in the account file until the next run
+
+        :return:
+        """
+        transfers_data = self._data['account_data'][0]['transfers_data']
+        limit = int(time.time()) - self._archive_age
+        to_archive = []
+        to_keep = []
+        for p in transfers_data:
+            if p['is_confirmed'] and int(p['timestamp']) < limit:
+                to_archive.append(p)
+            else:
+                to_keep.append(p)
+
+        to_archive.sort(key=lambda p: int(p['timestamp']))
+        full_size = len(to_archive) - len(to_archive) % self._archive_segment_size
+        if full_size == 0:
+            return
+
+        count = 0
+        for i in range(0, full_size, self._archive_segment_size):
+            count += self._archive.append_segment(to_archive[i:i + self._archive_segment_size])
+
+        self._data['account_data'][0]['transfers_data'] = to_archive[full_size:] + to_keep
+        with open(self._filename, 'w') as account_data:
+            json.dump(self._data, account_data, indent=4)
+
+        self._logger.info("Archived " + str(count) + " transfer(s).")
+
+    def get_transfer_history(self, start=None, end=None, bundle=None):
+        """
+        Gets saved transfers from the account file and the archive, sorted by timestamp
+        start and end are timestamps (inclusive), bundle is a bundle hash
+
+        :param start:
+        :param end:
+        :param bundle:
+        :return: List of transfers
+        """
+        transfers = self._archive.find_transfers(start, end, bundle)
+        for p in self._data['account_data'][0]['transfers_data']:
+            timestamp = int(p['timestamp'])
+            if start is not None and timestamp < start:
+                continue
+            if end is not None and timestamp > end:
+                continue
+            if bundle is not None and p['bundle'] != bundle:
+                continue
+            if self._archive.contains(p['transaction_hash']):
+                continue
+            transfers.append(p)
+
+        return sorted(transfers, key=lambda p: int(p['timestamp']))
+
     def _update_fal_balance(self):
         """
         Updates the f_index and l_index
@@ -417,7 +479,7 @@ class Account:
             saved_txn_hashes.append(txn_hash)
 
         for th in my_all_txn_hashes:
-            if th not in saved_txn_hashes:
+            if th not in saved_txn_hashes and not self._archive.contains(th):
                 new_txn_hashes.append(my_all_txn_hashes[th])
 
         if len(new_txn_hashes) > 0:
@@ -450,6 +512,8 @@ class Account:
 
                 self.on_new_transaction_received(txn, is_confirmed)
 
+        self._archive_transfers()
+
         if print_history:
             if full_history:
                 self.print_full_account_info()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+from utils.archive import TransferArchive
+
+
+def make_transfers(start, count):
+    return [{
+        'transaction_hash': 'HASH{0}'.format(i),
+        'is_confirmed': True,
+        'timestamp': str(1000 + i),
+        'tag': 'TAG',
+        'address': 'ADDRESS',
+        'message': 'some message',
+        'value': '0',
+        'bundle': 'BUNDLE{0}'.format(i // 5)
+    } for i in range(start, start + count)]
+
+
+class TransferArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._tmp_dir.name, 'account.archive')
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_append_and_reopen(self):
+        archive = TransferArchive(self._path)
+        self.assertEqual(archive.append_segment(make_transfers(0, 10)), 10)
+        self.assertEqual(archive.append_segment(make_transfers(10, 10)), 10)
+
+        archive = TransferArchive(self._path)
+        self.assertTrue(archive.contains('HASH0'))
+        self.assertTrue(archive.contains('HASH19'))
+        self.assertFalse(archive.contains('HASH20'))
+        self.assertEqual(len(archive.find_transfers()), 20)
+
+    def test_index_does_not_store_hashes(self):
+        archive = TransferArchive(self._path)
+        archive.append_segment(make_transfers(0, 10))
+
+        with open(os.path.join(self._path, 'index.json'), 'r') as index_data:
+            self.assertNotIn('HASH0', index_data.read())
+        self.assertTrue(os.path.exists(os.path.join(self._path, 'segment_000000.hashes.gz')))
+
+    def test_append_skips_archived_transfers(self):
+        archive = TransferArchive(self._path)
+        archive.append_segment(make_transfers(0, 10))
+
+        archive = TransferArchive(self._path)
+        self.assertEqual(archive.append_segment(make_transfers(0, 10)), 0)
+        self.assertEqual(archive.append_segment(make_transfers(5, 10)), 5)
+        self.assertEqual(len(archive.find_transfers()), 15)
+
+    def test_find_transfers_filters(self):
+        archive = TransferArchive(self._path)
+        archive.append_segment(make_transfers(0, 10))
+        archive.append_segment(make_transfers(10, 10))
+
+        transfers = archive.find_transfers(start=1002, end=1012)
+        self.assertEqual([p['transaction_hash'] for p in transfers], ['HASH{0}'.format(i) for i in range(2, 13)])
+
+        transfers = archive.find_transfers(bundle='BUNDLE3')
+        self.assertEqual([p['transaction_hash'] for p in transfers], ['HASH{0}'.format(i) for i in range(15, 20)])
+
+        self.assertEqual(archive.find_transfers(end=999), [])
+
+    def test_find_transfers_skips_segments(self):
+        archive = TransferArchive(self._path)
+        archive.append_segment(make_transfers(0, 10))
+        archive.append_segment(make_transfers(10, 10))
+        os.remove(os.path.join(self._path, 'segment_000000.json.gz'))
+
+        self.assertEqual(len(archive.find_transfers(start=1010)), 10)
+        self.assertEqual(len(archive.find_transfers(bundle='BUNDLE2')), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+import os
+import gzip
+import json
+
+
+DEFAULT_ARCHIVE_AGE = 2592000
+DEFAULT_ARCHIVE_SEGMENT_SIZE = 100
+
+
+class TransferArchive:
+    """
+    Immutable, compressed archive of confirmed transfers
+
+    Transfers are stored in gzip compressed JSON segments that are never rewritten once created.
+    A small index keeps the time range and bundles of each segment, so that queries only open the
+    segments that can match. The transaction hashes of each segment are kept in a compressed sidecar
+    file that is only read when a lookup needs it.
+    """
+
+    def __init__(self, path):
+        """
+        Constructor
+
+        :param path: Directory holding the index and the segments
+        """
+        self._path = path
+        self._index_filename = os.path.join(path, 'index.json')
+        self._index = {'segments': []}
+        self._transaction_hashes = None
+        self._read_index()
+
+    def _read_index(self):
+        """
+        Read archive index from file
+        An empty index is used if file not found
+        """
+        try:
+            with open(self._index_filename, 'r') as index_data:
+                self._index = json.load(index_data)
+        except FileNotFoundError:
+            return
+
+    def _write_index(self):
+        """
+        Writes the archive index, replacing the previous one atomically
+
+        :return:
+        """
+        tmp_filename = self._index_filename + '.tmp'
+        with open(tmp_filename, 'w') as index_data:
+            json.dump(self._index, index_data)
+        os.replace(tmp_filename, self._index_filename)
+
+    def _read_segment(self, segment):
+        """
+        Reads all transfers of a segment
+
+        :param segment: Index entry of the segment
+        :return: List of transfers
+        """
+        with gzip.open(os.path.join(self._path, segment['filename']), 'rt', encoding='utf-8') as segment_data:
+            return json.load(segment_data)
+
+    @staticmethod
+    def _hashes_filename(segment_filename):
+        """
+        Gets the filename of the transaction hashes sidecar of a segment
+
+        :param segment_filename:
+        :return:
+        """
+        return segment_filename[:-len('.json.gz')] + '.hashes.gz'
+
+    def _write_gzip(self, filename, data):
+        """
+        Writes data as gzip compressed JSON, replacing the file atomically
+
+        :param filename:
+        :param data:
+        :return:
+        """
+        path = os.path.join(self._path, filename)
+        tmp_path = path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as gzip_data:
+            json.dump(data, gzip_data)
+        os.replace(tmp_path, path)
+
+    def _load_transaction_hashes(self):
+        """
+        Reads the transaction hashes of all segments from their sidecar files
+
+        :return:
+        """
+        self._transaction_hashes = set()
+        for segment in self._index['segments']:
+            hashes_filename = os.path.join(self._path, self._hashes_filename(segment['filename']))
+            with gzip.open(hashes_filename, 'rt', encoding='utf-8') as hashes_data:
+                self._transaction_hashes.update(json.load(hashes_data))
+
+    def contains(self, transaction_hash):
+        """
+        Checks if a transaction is archived
+        The transaction hashes are loaded on first call
+
+        :param transaction_hash:
+        :return: True if the transaction is in a segment, else False
+        """
+        if self._transaction_hashes is None:
+            self._load_transaction_hashes()
+        return transaction_hash in self._transaction_hashes
+
+    def append_segment(self, transfers):
+        """
+        Writes transfers into a new segment and registers it in the index
+        Transfers that are already archived are skipped
+
+        :param transfers:
+        :return: Number of transfers written
+        """
+        transfers = [p for p in transfers if not self.contains(p['transaction_hash'])]
+        if len(transfers) == 0:
+            return 0
+
+        transfers = sorted(transfers, key=lambda p: int(p['timestamp']))
+        os.makedirs(self._path, exist_ok=True)
+        filename = 'segment_{0:06d}.json.gz'.format(len(self._index['segments']))
+        transaction_hashes = [p['transaction_hash'] for p in transfers]
+        self._write_gzip(filename, transfers)
+        self._write_gzip(self._hashes_filename(filename), transaction_hashes)
+
+        self._index['segments'].append({
+            'filename': filename,
+            'count': len(transfers),
+            'first_timestamp': int(transfers[0]['timestamp']),
+            'last_timestamp': int(transfers[-1]['timestamp']),
+            'bundles': sorted(set(p['bundle'] for p in transfers))
+        })
+        self._write_index()
+        self._transaction_hashes.update(transaction_hashes)
+        return len(transfers)
+
+    def find_transfers(self, start=None, end=None, bundle=None):
+        """
+        Gets archived transfers, optionally filtered by timestamp range and bundle
+        Only segments whose index entry matches the filters are read
+
+        :param start: Lowest timestamp (inclusive)
+        :param end: Highest timestamp (inclusive)
+        :param bundle: Bundle hash
+        :return: List of transfers
+        """
+        result = []
+        for segment in self._index['segments']:
+            if start is not None and segment['last_timestamp'] < start:
+                continue
+            if end is not None and segment['first_timestamp'] > end:
+                continue
+            if bundle is not None and bundle not in segment['bundles']:
+                continue
+
+            for p in self._read_segment(segment):
+                timestamp = int(p['timestamp'])
+                if start is not None and timestamp < start:
+                    continue
+                if end is not None and timestamp > end:
+                    continue
+                if bundle is not None and p['bundle'] != bundle:
+                    continue
+                result.append(p)
+
+        return result